@@ -2,42 +2,125 @@ from graph import *
 from load_data import *
 from visualization import NetworkVisualizer
 from calculate import *
+import numpy as np
 
-def all_or_nothing_assignment(G: nx.digraph, od_demand, link_travel_times: Dict[str, Dict[str, float]]):
+def group_demand_by_origin(od_demand) -> Dict[str, List[Tuple[str, float]]]:
+    """把 OD 需求按起点分组，只保留正需求；最短路只需从这些起点出发计算"""
+    od_by_origin = {}
+    for (orig, dest), demand_val in od_demand.items():
+        if demand_val <= 0:
+            continue
+        if orig not in od_by_origin:
+            od_by_origin[orig] = []
+        od_by_origin[orig].append((dest, demand_val))
+    return od_by_origin
+
+def index_od_demand(od_by_origin: Dict[str, List[Tuple[str, float]]], node_index: Dict[str, int]):
+    """
+    把按起点分组的 OD 需求转成整数下标形式：
+    [(起点下标, 终点下标数组, 需求数组), ...]
+
+    K 次迭代反复分配同一批需求时只做一次名字哈希
+    """
+    od_indexed = []
+    for orig, dest_list in od_by_origin.items():
+        dest_idx = np.array([node_index[dest] for dest, _ in dest_list])
+        demands = np.array([demand_val for _, demand_val in dest_list])
+        od_indexed.append((node_index[orig], dest_idx, demands))
+    return od_indexed
+
+def all_or_nothing_assignment_arr(G: nx.digraph, link_travel_times: Dict[str, Dict[str, float]],
+                                  od_by_origin: Dict[str, List[Tuple[str, float]]],
+                                  edge_id: Dict[Tuple[str, str], int],
+                                  csr_bundle=None, sssp_cache: SSSPCache = None,
+                                  od_indexed=None) -> np.ndarray:
+    """
+    执行一次全有全无（AON）分配（数组版本）
+
+    流量累加在按边编号索引的 ndarray 上，内层循环只做整数下标访问
+
+    Args:
+        link_travel_times: 当前各 link 的行程时间（用于最短路计算）；
+            传 None 表示调用方已自行把时间写进 csr.data
+        od_by_origin: 按起点分组后的 OD 需求（见 group_demand_by_origin）
+        edge_id: (begin, end) -> 有向边编号
+        csr_bundle: 可选，build_csr 的返回值；反复调用（如 IA 的 K 次
+            迭代）时传入以复用矩阵结构，不必每次重建
+        sssp_cache: 可选，跨多轮调用的最短路树缓存；
+            边权相对上一轮的变化都在容差内时跳过 Dijkstra
+        od_indexed: 可选，index_od_demand 的结果；
+            传入后 OD 对不再逐轮做名字哈希
+
+    Returns:
+        np.ndarray: 每条有向边上的分配流量 y[i]
+    """
+    y_arr = np.zeros(len(edge_id))
+
+    # 组装 CSR 邻接矩阵并写入当前行程时间，最短路交给 scipy 的 C 实现
+    if csr_bundle is None:
+        csr_bundle = build_csr(G)
+    csr, node_names, node_index, edge_pos = csr_bundle
+    if link_travel_times is not None:
+        update_csr_costs(csr, edge_pos, link_travel_times)
+
+    if od_indexed is None:
+        od_indexed = index_od_demand(od_by_origin, node_index)
+
+    if sssp_cache is not None:
+        sssp_cache.refresh(csr.data)
+        pred_by_origin = sssp_cache.pred_by_origin
+    else:
+        pred_by_origin = {}
+
+    # 所有缺最短路树的起点合成一次多源 Dijkstra 调用
+    missing = [orig_idx for orig_idx, _, _ in od_indexed if orig_idx not in pred_by_origin]
+    if missing:
+        dists, preds = shortest_paths_from_csr_multi(csr, np.array(missing))
+        for row, orig_idx in enumerate(missing):
+            pred_by_origin[orig_idx] = preds[row]
+
+    for orig_idx, dest_idx, demands in od_indexed:
+        pred = pred_by_origin[orig_idx]
+        for j in range(len(dest_idx)):
+            t = dest_idx[j]
+            demand_val = demands[j]
+            if t != orig_idx and pred[t] < 0:
+                print(f"Warning: No path from {node_names[orig_idx]} to {node_names[t]}")
+                continue
+            # 从终点沿前驱数组回溯，边走边把需求加到对应边上，
+            # 不再生成中间的路径节点列表
+            while t != orig_idx:
+                u = pred[t]
+                y_arr[edge_id[(node_names[u], node_names[t])]] += demand_val
+                t = u
+
+    return y_arr
+
+def all_or_nothing_assignment(G: nx.digraph, od_demand, link_travel_times: Dict[str, Dict[str, float]], od_by_origin=None):
     """
     执行一次全有全无（AON）分配
-    
+
     Args:
-        nodes: 节点
-        edges: 边
         od_demand: dict[(orig, dest)] = demand_value
         link_travel_times: 当前各 link 的行程时间（用于最短路计算）
-    
+        od_by_origin: 可选，按起点分组好的需求；
+            调用方（如 IA 的 K 次迭代）可以把分组结果算好传进来复用
+
     Returns:
-        list[float]: 每条 link 上的分配流量 y[i]
+        dict: y[begin][end] = 分配流量
     """
-    y = {}
+    if od_by_origin is None:
+        od_by_origin = group_demand_by_origin(od_demand)
 
-    for (orig, dest), demand_val in od_demand.items():
-        if demand_val <= 0:
-            continue
-        path = get_shortest_path(G, orig, dest, link_travel_times)
-        if path is None:
-            print(f"Warning: No path from {orig} to {dest}")
-            continue
-        for i in range(len(path) - 1):
-            # 遍历数组
-            begin=path[i]
-            end=path[i+1]
-            
+    edge_id = {(u, v): i for i, (u, v) in enumerate(G.edges())}
+    y_arr = all_or_nothing_assignment_arr(G, link_travel_times, od_by_origin, edge_id)
+
+    y = {}
+    for (begin, end), i in edge_id.items():
+        if y_arr[i] != 0:
             if begin not in y:
                 y[begin] = {}
-            
-            if end not in y[begin]:
-                y[begin][end] = 0
-
-            y[begin][end] += demand_val
-
+            y[begin][end] = y_arr[i]
     return y
 
 def All_or_Nothing_Traffic_Assignment(nodes, edges, od_demand):
@@ -54,36 +137,34 @@ def All_or_Nothing_Traffic_Assignment(nodes, edges, od_demand):
             'node_names': node_names
         }
     """
-    G = get_graph(nodes, edges)
-    link_travel_times = {}
+    # Network 里 csr.data 初始就是自由流时间（get_graph 的 cost 属性）
+    net = Network(nodes, edges)
+
+    # 调用 AON 函数
+    od_by_origin = group_demand_by_origin(od_demand)
+    y_arr = all_or_nothing_assignment_arr(net.graph, None, od_by_origin, net.edge_id, csr_bundle=net.csr_bundle)
 
-    # 构建自由流行程时间
-    for edge in edges:
-        begin = edge['begin']
-        end = edge['end']
+    # 分配后的行程时间，连同流量一起还原成嵌套 dict
+    t_arr = net.travel_time(y_arr)
+    flow_aon = {}
+    link_travel_times = {}
+    for i in range(len(net.begins)):
+        begin = net.begins[i]
+        end = net.ends[i]
+        if y_arr[i] != 0:
+            if begin not in flow_aon:
+                flow_aon[begin] = {}
+            flow_aon[begin][end] = y_arr[i]
         if begin not in link_travel_times:
             link_travel_times[begin] = {}
-        if end not in link_travel_times:
-            link_travel_times[end] = {}
-        link_travel_times[begin][end] = edge['free_flow_time']
-        link_travel_times[end][begin] = edge['free_flow_time']
-
-    
-    # 调用 AON 函数
-    flow_aon = all_or_nothing_assignment(G, od_demand, link_travel_times)
-    
-    for edge in edges:
-        edge_begin = edge['begin']
-        edge_end = edge['end']
-        link_travel_times[edge_begin][edge_end] = get_link_travel_time(flow_aon, edge, edge_begin, edge_end)
-        link_travel_times[edge_end][edge_begin] = get_link_travel_time(flow_aon, edge, edge_end, edge_begin)
+        link_travel_times[begin][end] = t_arr[i]
 
     return {
         'nodes': nodes,
         'edges': edges,
         'flow': flow_aon,
         'link_travel_times': link_travel_times,
-        'graph': G,
+        'graph': net.graph,
     }
 
 if __name__ == '__main__':
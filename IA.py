@@ -2,6 +2,7 @@ from AON import *
 from graph import *
 from calculate import *
 from visualization import *
+import numpy as np
 
 def Incremental_Traffic_Assignment(nodes, edges, od_demand,
     K=1000
@@ -25,51 +26,37 @@ def Incremental_Traffic_Assignment(nodes, edges, od_demand,
     """
 
     step_demand = {od: amt / K for od, amt in od_demand.items()}
+    # 每次增量分配的 OD 需求不变，按起点的分组只算一次，K 次迭代复用
+    od_by_origin = group_demand_by_origin(step_demand)
 
-    G = get_graph(nodes, edges)
-    x = {} # 流量全是0
-    link_travel_times = {} # 自由流时间
-    for node in nodes:
-        if node not in x: x[node] = {}
-        for node1 in nodes:
-            x[node][node1] = 0
-
-    for edge in edges:
-        begin = edge['begin']
-        end = edge['end']
-        if begin not in link_travel_times:
-            link_travel_times[begin] = {}
-        if end not in link_travel_times:
-            link_travel_times[end] = {}
-        link_travel_times[begin][end] = edge['free_flow_time']
-        link_travel_times[end][begin] = edge['free_flow_time']
+    # 路网的 SoA 数组和 CSR 矩阵统一由 Network 构建一次，
+    # 流量直接存成按边编号索引的数组
+    net = Network(nodes, edges)
+    x_arr = np.zeros(len(net.begins)) # 流量全是0
+    sssp_cache = SSSPCache() # 后期行程时间趋于稳定时复用最短路树
+    od_indexed = index_od_demand(od_by_origin, net.node_index) # OD 下标化只做一次
 
     for k in range(1, K + 1):
-        # 获取当前行程时间列表
-        t_current = {}
-        for node in nodes:
-            t_current[node] = {}
-        for edge in edges:
-            begin = edge['begin']
-            end = edge['end']
-            t_current[begin][end] = get_link_travel_time(x, edge, begin, end)
-            t_current[end][begin] = get_link_travel_time(x, edge, end, begin)
-        # 执行 AON 分配当前 step_demand 
-        y_k = all_or_nothing_assignment(G, step_demand, t_current)
-        for edge in edges:
-            begin = edge['begin']
-            end = edge['end']
-            if begin in y_k and end in y_k[begin]:
-                x[begin][end] += y_k[begin][end]
-            if end in y_k and begin in y_k[end]:
-                x[end][begin] += y_k[end][begin]
+        # 获取当前行程时间并写入 csr.data
+        t_arr = net.travel_time(x_arr)
+        net.set_costs(t_arr)
+        # 执行 AON 分配当前 step_demand
+        y_arr = all_or_nothing_assignment_arr(net.graph, None, od_by_origin, net.edge_id,
+                                              csr_bundle=net.csr_bundle, sssp_cache=sssp_cache,
+                                              od_indexed=od_indexed)
+        x_arr += y_arr
 
-
-    for edge in edges:
-        begin = edge['begin']
-        end = edge['end']
-        link_travel_times[begin][end] = get_link_travel_time(x, edge, begin, end)
-        link_travel_times[end][begin] = get_link_travel_time(x, edge, end, begin)
+    # 最终行程时间，并把流量还原成嵌套 dict（对外返回格式不变）
+    t_arr = net.travel_time(x_arr)
+    link_travel_times = {}
+    x = {node: {node1: 0 for node1 in nodes} for node in nodes}
+    for i in range(len(net.begins)):
+        begin = net.begins[i]
+        end = net.ends[i]
+        if begin not in link_travel_times:
+            link_travel_times[begin] = {}
+        link_travel_times[begin][end] = t_arr[i]
+        x[begin][end] = x_arr[i]
 
     return {
         'nodes': nodes,
@@ -77,7 +64,7 @@ def Incremental_Traffic_Assignment(nodes, edges, od_demand,
         'flow': x,
         'link_travel_time': link_travel_times,
         'K': K,
-        'graph': G,
+        'graph': net.graph,
     }
 
 if __name__ == '__main__':
@@ -1,9 +1,46 @@
 from typing import Dict, List, Tuple
+import numpy as np
+
+def get_link_travel_times_vec(free_flow_times: np.ndarray, inv_capacities: np.ndarray, flows: np.ndarray) -> np.ndarray:
+    """
+    路阻函数的向量化版本：一次算出所有边的 t = t0 * (1 + (Q/C))^2
+
+    传入的是预先算好的 1/C（容量为 0 的边取 0），热循环里只做乘法；
+    平方也展开成一次乘法，不走浮点 pow
+    """
+    s = 1.0 + flows * inv_capacities
+    return free_flow_times * s * s
+
+def make_travel_time_kernel(free_flow_times: np.ndarray, inv_capacities: np.ndarray, beta: int = 2):
+    """
+    按路阻函数指数提前特化内核：t = t0 * (1 + Q/C)^beta
+
+    beta 在构建时选定，热循环里不再分支；2 和 4 这两个常用指数
+    展开成纯乘法，其余取值退回浮点幂
+    """
+    if beta == 2:
+        def kernel(flows):
+            s = 1.0 + flows * inv_capacities
+            return free_flow_times * s * s
+    elif beta == 4:
+        def kernel(flows):
+            s = 1.0 + flows * inv_capacities
+            s2 = s * s
+            return free_flow_times * s2 * s2
+    else:
+        def kernel(flows):
+            return free_flow_times * (1.0 + flows * inv_capacities) ** beta
+    return kernel
+
+def inverse_capacities(capacities: np.ndarray) -> np.ndarray:
+    """预计算 1/C；容量为 0 的边取 0，调用方不必在热循环里分支"""
+    capacities = np.asarray(capacities, dtype=np.float64)
+    return np.divide(1.0, capacities, out=np.zeros_like(capacities), where=capacities > 0)
 
 def get_link_travel_time(flow: Dict[str, Dict[str, float]], edge, begin, end):
     """路阻函数/行程时间函数：t = t0 * (1 + (Q/C))^2"""
-    t0 = edge['free_flow_time']
-    C = edge['capacity']
+    t0 = edge.free_flow_time
+    C = edge.capacity
     if begin not in flow or end not in flow[begin]: 
         return t0
     Q = flow[begin][end]
@@ -1,31 +1,219 @@
 import networkx as nx
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import dijkstra, floyd_warshall
 from typing import *
-from load_data import parse_network
+from load_data import parse_network, directed_edge_arrays, directed_edge_index, Edges
+from calculate import inverse_capacities, make_travel_time_kernel
 
-def get_graph(nodes: Dict, edges: Dict) -> nx.DiGraph:
+def get_graph(nodes: Dict, edges: Edges) -> nx.DiGraph:
     G = nx.DiGraph()
     G.add_nodes_from(nodes.keys())
-    for edge in edges:
-        G.add_edge(edge['begin'], edge['end'], cost=edge['free_flow_time'], capacity=edge['capacity'], flow=0)
-        # 注释掉反向边，避免可视化混乱（如需双向网络可保留）
-        G.add_edge(edge['end'], edge['begin'], cost=edge['free_flow_time'], capacity=edge['capacity'], flow=0)
+    # 按 SoA 列组好正向/反向边表后整批插入，不走逐边 add_edge
+    # （反向边只在道路是双向时补上，undirected 标记来自 parse_network，默认双向）
+    forward = [(b, e, {'cost': t, 'capacity': c, 'flow': 0})
+               for b, e, t, c in zip(edges.begin, edges.end, edges.free_flow_time, edges.capacity)]
+    G.add_edges_from(forward)
+    und = edges.undirected.astype(bool)
+    reverse = [(e, b, {'cost': t, 'capacity': c, 'flow': 0})
+               for b, e, t, c in zip(edges.begin[und], edges.end[und],
+                                     edges.free_flow_time[und], edges.capacity[und])]
+    G.add_edges_from(reverse)
     return G
 
-def get_shortest_path(G: nx.DiGraph, source: str, target: str, link_travel_time: Dict[str, Dict[str, float]]) -> List[str]:
+def build_csr(G: nx.DiGraph):
+    """
+    把图转成 scipy 的 CSR 邻接矩阵，最短路可以交给 C 实现的 Dijkstra
+
+    Returns:
+        csr: CSR 邻接矩阵，data 里存各有向边的通行时间
+        node_names: 下标 -> 节点名
+        node_index: 节点名 -> 下标
+        edge_pos: (begin, end) -> 该边在 csr.data 中的下标，
+                  更新行程时间时只改 csr.data，不重建矩阵
+    """
+    node_names = list(G.nodes())
+    node_index = {name: i for i, name in enumerate(node_names)}
+    n = len(node_names)
+
+    rows = []
+    cols = []
+    costs = []
+    for u, v, cost in G.edges(data='cost'):
+        rows.append(node_index[u])
+        cols.append(node_index[v])
+        costs.append(cost)
+    csr = csr_matrix((costs, (rows, cols)), shape=(n, n))
+
+    # coo -> csr 转换会按 (row, col) 重排 data，这里重新定位每条边的下标
+    edge_pos = {}
+    indptr, indices = csr.indptr, csr.indices
+    for u, v in G.edges():
+        i, j = node_index[u], node_index[v]
+        k = indptr[i] + np.searchsorted(indices[indptr[i]:indptr[i + 1]], j)
+        edge_pos[(u, v)] = int(k)
+
+    return csr, node_names, node_index, edge_pos
+
+class Network:
+    """
+    路网的 SoA 视图：有向边平行数组 + CSR 邻接矩阵
+
+    把 AON/IA 反复使用的数组集中起来，只构建一次：
+        graph: 对应的 nx.DiGraph（只用于可视化等非热点路径）
+        begins/ends: 各有向边的起终点名
+        fft/cap: 自由流时间和容量（np.ndarray）
+        edge_id: (begin, end) -> 有向边编号
+        csr/node_names/node_index/edge_pos: build_csr 的结果
+        cost_pos: 第 i 条有向边在 csr.data 中的下标
+    """
+
+    def __init__(self, nodes: Dict, edges: Edges):
+        self.nodes = nodes
+        self.edges = edges
+        self.graph = get_graph(nodes, edges)
+        self.begins, self.ends, self.fft, self.cap = directed_edge_arrays(edges)
+        self.inv_cap = inverse_capacities(self.cap)
+        # 路阻内核在这里按指数特化一次，后面每轮直接调用
+        self.travel_time = make_travel_time_kernel(self.fft, self.inv_cap)
+        self.edge_id = directed_edge_index(self.begins, self.ends)
+        self.csr, self.node_names, self.node_index, self.edge_pos = build_csr(self.graph)
+        self.cost_pos = np.array([self.edge_pos[(b, e)] for b, e in zip(self.begins, self.ends)])
+
+    @property
+    def csr_bundle(self):
+        return self.csr, self.node_names, self.node_index, self.edge_pos
+
+    def set_costs(self, t_arr: np.ndarray):
+        """把按边编号排列的行程时间写进 csr.data"""
+        self.csr.data[self.cost_pos] = t_arr
+
+def update_csr_costs(csr, edge_pos, link_travel_time: Dict[str, Dict[str, float]]):
+    """按 link_travel_time 就地更新 csr.data 中的通行时间"""
+    data = csr.data
     for begin, end_dict in link_travel_time.items():
         for end, travel_time in end_dict.items():
-            G.edges[begin, end]['cost'] = travel_time
-    path = nx.dijkstra_path(G, source=source, target=target, weight='cost')
+            data[edge_pos[(begin, end)]] = travel_time
+
+class SSSPCache:
+    """
+    最短路树缓存：IA 后期各边行程时间几乎不再变化时，
+    相对变化都在容差内就直接复用上一轮的前驱数组，跳过整个 Dijkstra
+    """
+
+    def __init__(self, tol: float = 1e-4):
+        self.tol = tol
+        self.prev_costs = None
+        self.pred_by_origin = {}
+
+    def refresh(self, costs: np.ndarray):
+        """边权变化超过容差时清空缓存并记录新边权；返回缓存是否仍然有效"""
+        if self.prev_costs is not None and \
+                bool(np.all(np.abs(costs - self.prev_costs) <= self.tol * self.prev_costs)):
+            return True
+        self.pred_by_origin.clear()
+        self.prev_costs = costs.copy()
+        return False
+
+def shortest_paths_from_csr(csr, source_idx: int):
+    """从单个源点跑 scipy 的 Dijkstra，返回 (dist, predecessors)"""
+    dist, pred = dijkstra(csr, directed=True, indices=source_idx, return_predecessors=True)
+    return dist, pred
+
+def shortest_paths_from_csr_multi(csr, source_indices):
+    """
+    对一批源点一次性跑 scipy 的 Dijkstra
+
+    多个源在同一次 C 调用内完成，省去逐源的 Python 往返；
+    返回的 dist/pred 都是 (源数, 节点数) 的二维数组
+    """
+    dist, pred = dijkstra(csr, directed=True, indices=source_indices, return_predecessors=True)
+    return np.atleast_2d(dist), np.atleast_2d(pred)
+
+def path_from_predecessors(pred, node_names: List[str], source_idx: int, target_idx: int) -> List[str]:
+    """从前驱数组回溯出 source -> target 的节点路径；不可达返回 None"""
+    if target_idx == source_idx:
+        return [node_names[source_idx]]
+    if pred[target_idx] < 0:
+        return None
+    path = [node_names[target_idx]]
+    t = target_idx
+    while t != source_idx:
+        t = pred[t]
+        path.append(node_names[t])
+    path.reverse()
     return path
 
-def get_all_shortest_paths(G: nx.DiGraph) -> Dict[str, List[str]]:
-    all_paths = nx.all_pairs_dijkstra_path(G, weight='cost')
-    return dict(all_paths)
+def update_graph_costs(G: nx.DiGraph, link_travel_time: Dict[str, Dict[str, float]]):
+    """把当前行程时间写进图的边权；一轮分配只需调用一次，查询时不再重写"""
+    for begin, end_dict in link_travel_time.items():
+        for end, travel_time in end_dict.items():
+            G.edges[begin, end]['cost'] = travel_time
+
+def shortest_path(G: nx.DiGraph, source: str, target: str) -> List[str]:
+    """纯查询：按图里已有的边权求最短路径"""
+    return nx.dijkstra_path(G, source=source, target=target, weight='cost')
+
+def get_shortest_path(G: nx.DiGraph, source: str, target: str, link_travel_time: Dict[str, Dict[str, float]]) -> List[str]:
+    """已废弃：每次查询都会重写全部边权。
+
+    请改用 update_graph_costs（每轮一次）+ shortest_path（纯查询），
+    或者热点路径上的 CSR 版本（build_csr / shortest_paths_from_csr_multi）
+    """
+    update_graph_costs(G, link_travel_time)
+    return shortest_path(G, source, target)
+
+def get_shortest_paths_from_source(G: nx.DiGraph, source: str, link_travel_time: Dict[str, Dict[str, float]] = None) -> Tuple[Dict[str, float], Dict[str, List[str]]]:
+    """单源 Dijkstra：一次扫描同时返回 source 到所有节点的时间和路径
+
+    link_travel_time 不为 None 时先更新边权；多个源共用一份行程时间的话，
+    调用方应先 update_graph_costs 一次，然后传 None
+    """
+    if link_travel_time is not None:
+        update_graph_costs(G, link_travel_time)
+    dist, paths = nx.single_source_dijkstra(G, source, weight='cost')
+    return dist, paths
+
+def get_all_shortest_paths(G: nx.DiGraph) -> Dict[str, Dict[str, List[str]]]:
+    """
+    全源最短路：一次 scipy Dijkstra 算出全部前驱数组，再按 OD 对回溯路径
+
+    networkx 的 all_pairs_dijkstra_path 是纯 Python 实现；
+    这里整个 APSP 在一次 C 调用里完成，Python 侧只做路径回溯。
+    返回格式与原来一致：all_paths[u][v] = 节点路径列表（不可达的 v 不出现）
+    """
+    csr, node_names, node_index, _ = build_csr(G)
+    _, pred = dijkstra(csr, directed=True, return_predecessors=True)
+    return _paths_from_pred_matrix(pred, node_names)
+
+def get_all_shortest_paths_dense(G: nx.DiGraph) -> Dict[str, Dict[str, List[str]]]:
+    """
+    稠密小图的全源最短路：C 实现的 Floyd-Warshall
+
+    拥堵后的全源查询跑在几十个节点的稠密图上，O(V^3) 的编译实现
+    比逐源 Dijkstra 少一层堆操作；返回格式与 get_all_shortest_paths 一致
+    """
+    csr, node_names, node_index, _ = build_csr(G)
+    _, pred = floyd_warshall(csr, return_predecessors=True)
+    return _paths_from_pred_matrix(pred, node_names)
+
+def _paths_from_pred_matrix(pred, node_names: List[str]) -> Dict[str, Dict[str, List[str]]]:
+    """把 (V, V) 前驱矩阵回溯成 all_paths[u][v] = 节点路径列表"""
+    all_paths = {}
+    for i, u in enumerate(node_names):
+        paths_u = {}
+        for j, v in enumerate(node_names):
+            path = path_from_predecessors(pred[i], node_names, i, j)
+            if path is not None:
+                paths_u[v] = path
+        all_paths[u] = paths_u
+    return all_paths
 
 if __name__ == '__main__':
-    nodes, edges = parse_network()
+    nodes, edges = parse_network('json/network.json')
     G = get_graph(nodes, edges)
-    path = get_shortest_path(G, source='A', target='F')
+    # 图里的 cost 初始就是自由流时间，直接做纯查询
+    path = shortest_path(G, source='A', target='F')
     paths = get_all_shortest_paths(G)
     print(f"Dijkstra最短路径: {path}")
     print(f"所有最短路径: {paths}")
\ No newline at end of file
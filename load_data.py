@@ -1,42 +1,138 @@
 from typing import Dict, List, Tuple
+from dataclasses import dataclass
+from collections import namedtuple
+from functools import lru_cache
 import json
+import mmap
 import numpy as np
-from math import sqrt
+
+# 逐条遍历 Edges 时吐出的轻量视图
+Edge = namedtuple('Edge', ['begin', 'end', 'distance', 'free_flow_time', 'capacity', 'undirected'])
+
+@dataclass
+class Edges:
+    """
+    边表的 SoA 布局：每个字段一列 ndarray
+
+    消费方（路阻计算、建图、CSR 组装）按列整块取数；
+    仍支持 len() 和 for edge in edges 逐条遍历（得到 Edge namedtuple），
+    方便原来按 list-of-dict 写的代码迁移
+    """
+    begin: np.ndarray
+    end: np.ndarray
+    distance: np.ndarray
+    free_flow_time: np.ndarray
+    capacity: np.ndarray
+    undirected: np.ndarray
+
+    def __len__(self):
+        return len(self.begin)
+
+    def __iter__(self):
+        for i in range(len(self.begin)):
+            yield Edge(self.begin[i], self.end[i], self.distance[i],
+                       self.free_flow_time[i], self.capacity[i], bool(self.undirected[i]))
+
+try:
+    # orjson 是 C 实现的 JSON 解析器，比标准库快一个量级；可选依赖
+    import orjson
+except ImportError:
+    orjson = None
 
 
 # 获取图的数据
+# 同一个 json 在一次运行里会被 main.py 的几问反复读，解析结果按路径缓存
+@lru_cache(maxsize=None)
 def load_data(file_path: str) -> Dict:
-    with open(file_path) as f:
-        data = json.load(f)
+    if orjson is not None:
+        # 文件用 mmap 映射后直接交给解析器（orjson 只收 memoryview 这类
+        # 缓冲对象），省掉 read() 整文件的 bytes 拷贝
+        with open(file_path, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                data = orjson.loads(memoryview(mm))
+    else:
+        with open(file_path) as f:
+            data = json.load(f)
     return data
 
+@dataclass
+class Demand:
+    """
+    OD 需求的 SoA 布局：起点 / 终点 / 需求量各一列 ndarray
+
+    与 Edges 同样的思路：分配算法可以按列整块取数；
+    items() 提供 dict 风格的 ((起点, 终点), 需求量) 遍历，
+    as_dict() 还原成原来的 {(起点, 终点): 需求量} 形式，供旧调用方使用
+    """
+    origins: np.ndarray
+    dests: np.ndarray
+    amounts: np.ndarray
+
+    def __len__(self):
+        return len(self.amounts)
+
+    def items(self):
+        for orig, dest, amount in zip(self.origins, self.dests, self.amounts):
+            yield (orig, dest), amount
+
+    def as_dict(self) -> Dict[Tuple[str, str], float]:
+        return dict(self.items())
+
 # 获取需求数据
-def get_demand(demand_path) -> Dict[Tuple[str, str], float]:
+def get_demand(demand_path) -> Demand:
     demand_data: Dict[str, List] = load_data(demand_path)
-    begins = demand_data['from']
-    ends = demand_data['to']
-    amounts = demand_data['amount']
+    return Demand(
+        origins=np.asarray(demand_data['from']),
+        dests=np.asarray(demand_data['to']),
+        amounts=np.asarray(demand_data['amount'], dtype=np.float64),
+    )
+
+def node_coord_arrays(nodes: Dict[str, List]) -> Tuple[np.ndarray, Dict[str, int]]:
+    """
+    节点坐标的数组视图：(N, 2) 的 float64 坐标表 + 名字 -> 行号映射
+
+    批量几何计算（距离、可视化的偏移/中点等）用它代替逐节点查 dict，
+    坐标在内存里是连续的
+    """
+    name_to_idx = {name: i for i, name in enumerate(nodes)}
+    coords = np.array([nodes[name][:2] for name in nodes], dtype=np.float64)
+    return coords, name_to_idx
 
-    demands = {(begin, end): amount for begin, end, amount in zip(begins, ends, amounts)}
-    return demands
+def directed_edge_arrays(edges: Edges) -> Tuple[List[str], List[str], np.ndarray, np.ndarray]:
+    """
+    把边表展开成有向边的平行数组（双向道路补上反向边）
+
+    :return: (begins, ends, free_flow_times, capacities)
+        begins/ends 是各有向边的起终点名；
+        free_flow_times/capacities 是对应的 np.ndarray，
+        可直接喂给向量化的路阻函数
+    """
+    und = edges.undirected.astype(bool)
+    begins = list(edges.begin) + list(edges.end[und])
+    ends = list(edges.end) + list(edges.begin[und])
+    free_flow_times = np.concatenate([edges.free_flow_time, edges.free_flow_time[und]])
+    capacities = np.concatenate([edges.capacity, edges.capacity[und]])
+    return begins, ends, free_flow_times, capacities
 
-def parse_network(network_path) -> Tuple[Dict, List[Dict[str, any]]]:
+def directed_edge_index(begins: List[str], ends: List[str]) -> Dict[Tuple[str, str], int]:
+    """(begin, end) -> 有向边编号，配合平行数组做整数下标访问"""
+    return {(b, e): i for i, (b, e) in enumerate(zip(begins, ends))}
+
+def parse_network(network_path) -> Tuple[Dict, Edges]:
     """
     Docstring for parse_network
-    
+
     :return: Description
-    :rtype: Tuple[List[str], List[Dict[str, any]]]: 
-        节点列表和边列表
-        节点包括名称
-        边：一个列表，每条边包括：
-        {
-            'from': 源节点名称,
-            'to': 目标节点名称,
-            'capacity': 边的容量,
-            'free_flow_time': 边的自由流时间（单位：秒）
-            'length': 距离
-            'speedmax': 边的最大速度（单位：km/h）
-        }
+    :rtype: Tuple[Dict, Edges]:
+        节点字典和边表
+        节点：{名称: [x, y]}
+        边：Edges（SoA 列布局），每条边包括：
+            begin: 源节点名称
+            end: 目标节点名称
+            capacity: 边的容量
+            free_flow_time: 边的自由流时间
+            distance: 距离
+            undirected: 是否双向道路
     """
 
     network_data = load_data(network_path)
@@ -45,28 +141,34 @@ def parse_network(network_path) -> Tuple[Dict, List[Dict[str, any]]]:
     nodes_dict: Dict = {node_name: [node_x, node_y] for node_name, node_x, node_y in zip(nodes['name'], nodes['x'], nodes['y'])}
 
     edges_dict: Dict[str, List] = network_data['links'] # 遍历边
-    edges_list: List[List] = [edges_dict['between'], edges_dict['speedmax'], edges_dict['capacity']]
-
-    ret_edges = [] # 返回的边数据
-    for i in range(len(edges_list[0])):
-        edge_dict = {}
-        edge_between = edges_list[0][i]
-        edge_begin, edge_end = edge_between
-        edge_dict['begin'] = edge_begin # 边的起点
-        edge_dict['end'] = edge_end # 边的终点
+    between = edges_dict['between']
 
-        # 算出边的距离
-        edge_distance = sqrt((nodes_dict[edge_begin][0] - nodes_dict[edge_end][0]) ** 2 
-                                + (nodes_dict[edge_begin][1] - nodes_dict[edge_end][1]) ** 2)
-        edge_dict['distance'] = edge_distance
+    # 坐标转成数组，距离和自由流时间一次向量化算完，不在 Python 循环里逐边开方
+    coords, name_to_idx = node_coord_arrays(nodes_dict)
+    begin_idx = np.array([name_to_idx[pair[0]] for pair in between])
+    end_idx = np.array([name_to_idx[pair[1]] for pair in between])
 
-        # 算出自由流时间（距离/速度）
-        edge_free_flow_time = edge_distance / edges_list[1][i]
-        edge_dict['free_flow_time'] = edge_free_flow_time
+    # 边的距离和自由流时间（距离/速度）
+    diff = coords[begin_idx] - coords[end_idx]
+    distances = np.hypot(diff[:, 0], diff[:, 1])
+    free_flow_times = distances / np.asarray(edges_dict['speedmax'], dtype=np.float64)
 
-        capacity = edges_list[2][i]
-        edge_dict['capacity'] = capacity
+    # 道路是否双向：JSON 里可以用 links['undirected'] 对整个数据集
+    # 或逐边指定；省略时沿用原有行为，所有道路按双向处理
+    undirected = edges_dict.get('undirected', True)
+    if isinstance(undirected, list):
+        undirected_arr = np.asarray(undirected, dtype=bool)
+    else:
+        undirected_arr = np.full(len(between), bool(undirected))
 
-        ret_edges.append(edge_dict)
+    # 返回的边数据（SoA 列布局）
+    ret_edges = Edges(
+        begin=np.array([pair[0] for pair in between]),
+        end=np.array([pair[1] for pair in between]),
+        distance=distances,
+        free_flow_time=free_flow_times,
+        capacity=np.asarray(edges_dict['capacity'], dtype=np.float64),
+        undirected=undirected_arr,
+    )
 
     return nodes_dict, ret_edges
\ No newline at end of file
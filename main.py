@@ -1,7 +1,7 @@
 from IA import Incremental_Traffic_Assignment
 from AON import All_or_Nothing_Traffic_Assignment
 from load_data import get_demand, parse_network
-from graph import get_graph, get_all_shortest_paths
+from graph import get_graph, get_all_shortest_paths, get_all_shortest_paths_dense
 from visualization import NetworkVisualizer
 import networkx as nx
 import traceback
@@ -19,31 +19,30 @@ if (__name__ == '__main__'):
     print("1、不考虑拥堵，任意两点间的最快的路径是什么？")
     G: nx.DiGraph = get_graph(nodes, edges)
     paths = get_all_shortest_paths(G)
-    
-    for i in range(len(nodes_names)):
-        for j in range(i + 1, len(nodes_names)):
-            print(f"{nodes_names[i]} -> {nodes_names[j]} : {paths[nodes_names[i]][nodes_names[j]]}")
+
+    # 结果拼成一个字符串一次输出，不逐行 print
+    print("\n".join(f"{a} -> {b} : {paths[a][b]}"
+                    for i, a in enumerate(nodes_names) for b in nodes_names[i + 1:]))
 
     print()
 
     print("2、假设各路段流量已知，考虑拥堵效应，任意两点之间的最快路径是什么？")
     print("以K=1000时IA的最终分配状态为例：")
     IA_dict = Incremental_Traffic_Assignment(nodes, edges, od_demand, K=1000)
-    G = IA_dict['graph']
     link_travel_time = IA_dict['link_travel_time']
 
+    # 复用第 1 问的 G，只就地改边权，不重新建图
     # 更新G中每条边的通行时间
     for edge in edges:
-        begin = edge['begin']
-        end = edge['end']
+        begin = edge.begin
+        end = edge.end
         G[begin][end]['cost'] = link_travel_time[begin][end]
         G[end][begin]['cost'] = link_travel_time[end][begin]
     
-    # 获得最短路径
-    paths = get_all_shortest_paths(G)
-    for i in range(len(nodes_names)):
-        for j in range(i + 1, len(nodes_names)):
-            print(f"{nodes_names[i]} -> {nodes_names[j]} : {paths[nodes_names[i]][nodes_names[j]]}")
+    # 获得最短路径；拥堵后的图接近全连通，小而稠密，用 Floyd-Warshall 版本
+    paths = get_all_shortest_paths_dense(G)
+    print("\n".join(f"{a} -> {b} : {paths[a][b]}"
+                    for i, a in enumerate(nodes_names) for b in nodes_names[i + 1:]))
 
     print()
 
@@ -1,16 +1,23 @@
 import numpy as np
 import networkx as nx
+import matplotlib
+matplotlib.use('Agg')  # 只导出图片，不弹窗；Agg 渲染器省去交互后端的开销
 import matplotlib.pyplot as plt
 import matplotlib.patches as patches
 import matplotlib.colors as mcolors
-from typing import Dict, List, Tuple
+from matplotlib.collections import LineCollection
+import matplotlib.font_manager as fm
+from typing import Dict, Tuple
 import warnings
 
-warnings.filterwarnings('ignore')
+# 只压掉没装 SimHei 的机器上的缺字形提示；其余警告（废弃接口等）照常可见
+warnings.filterwarnings('ignore', message=r'Glyph \d+ .* missing from font')
 
 # 设置中文字体
-plt.rcParams['font.sans-serif'] = ['SimHei']  
-plt.rcParams['axes.unicode_minus'] = False    
+plt.rcParams['font.sans-serif'] = ['SimHei']
+plt.rcParams['axes.unicode_minus'] = False
+# 在导入时查一次字体，把字体缓存预热掉，首张图不再扫描字体目录
+fm.findfont('SimHei')
 
 class NetworkVisualizer:
     """网络可视化工具类（修复标签显示+双向边优化）"""
@@ -26,119 +33,245 @@ class NetworkVisualizer:
         
         # 1. 初始化节点坐标（确保所有图节点都有坐标）
         self.pos = {}
+        missing = []
         for node in self.graph.nodes():
             if node in self.nodes and len(self.nodes[node]) == 2:
                 self.pos[node] = (self.nodes[node][0], self.nodes[node][1])
             else:
-                # 缺失坐标的节点分配默认位置（避免KeyError）
-                self.pos[node] = (np.random.uniform(0, 10), np.random.uniform(0, 10))
+                missing.append(node)
+        if missing:
+            # 缺失坐标的节点用固定种子的 spring_layout 一次性布好（避免KeyError）：
+            # 结果可复现，也比逐节点调随机数快
+            fallback = nx.spring_layout(self.graph.subgraph(missing), seed=0, scale=5, center=(5, 5))
+            for node in missing:
+                self.pos[node] = (float(fallback[node][0]), float(fallback[node][1]))
                 print(f"警告：节点[{node}]无坐标，分配默认位置{self.pos[node]}")
         
-        # 2. 检测双向边
+        # 2. 坐标的数组视图：边几何的批量计算按整数下标取坐标，不逐节点查 dict
+        #    （self.pos 保留给 networkx 的绘制接口）
+        self.node_idx = {n: i for i, n in enumerate(self.graph.nodes())}
+        self.pos_arr = np.array([self.pos[n] for n in self.graph.nodes()], dtype=np.float64)
+
+        # 3. 检测双向边；bidirectional_any 收录两个方向，
+        #    热循环里一次成员判断即可，不用先构造规范方向的元组
         self.bidirectional_edges = self._find_bidirectional_edges()
+        self.bidirectional_any = frozenset(
+            self.bidirectional_edges | {(v, u) for u, v in self.bidirectional_edges})
         
-        # 3. 预计算边的偏移位置（解决双向边重叠）
-        self.edge_offset = self._calc_edge_offset(offset=0.08)
+        # 4. 预计算边的偏移位置（解决双向边重叠）；
+        #    内部一律按边下标走 _offset_U/_offset_V 数组，
+        #    (u, v) 键的字典视图只在外部代码读 edge_offset 时才物化
+        self._calc_edge_offset(offset=0.08)
+        self._edge_offset_dict = None
+
+        # 5. 各 visualize_* 共用一张画布，省掉每次的字体/渲染器初始化
+        self.fig, self.ax = plt.subplots(figsize=(12, 9))
+
+        # 6. 颜色条的 ScalarMappable 也只建一次，每次画图只更新上限
+        self._red_sm = plt.cm.ScalarMappable(cmap=plt.cm.Reds, norm=plt.Normalize(vmin=0, vmax=1))
+        self._red_sm.set_array([])
+
+        # 7. 流量图的 artist 缓存：同一实例重复画流量图时走增量更新
+        self._flow_artists = None
+
+    def _reset_axes(self):
+        """清空画布并重建 Axes；colorbar 会另开 Axes，只 clear 主轴会越积越多"""
+        self.fig.clear()
+        self.ax = self.fig.add_subplot(111)
+        self._flow_artists = None  # 画布清掉后缓存的 artist 全部失效
+        return self.ax
 
     def _find_bidirectional_edges(self) -> set:
-        """找出所有双向边对"""
-        bidirectional = set()
-        for u, v in self.graph.edges():
-            if (v, u) in self.graph.edges() and (v, u) not in bidirectional:
-                bidirectional.add((u, v))
-        return bidirectional
-
-    def _calc_edge_offset(self, offset: float = 0.1) -> Dict[Tuple, Tuple[Tuple, Tuple]]:
-        """计算每条边的偏移起点和终点"""
-        edge_offset = {}
-        for u, v in self.graph.edges():
-            # 原始坐标
-            u_x, u_y = self.pos[u]
-            v_x, v_y = self.pos[v]
-            
-            # 计算边的方向向量和法向量
-            dx = v_x - u_x
-            dy = v_y - u_y
-            length = np.sqrt(dx**2 + dy**2) if dx**2 + dy**2 > 0 else 1
-            
-            # 单位法向量（垂直于边）
-            nx = -dy / length
-            ny = dx / length
-            
-            # 双向边偏移（正向/反向相反方向）
-            if (u, v) in self.bidirectional_edges:
-                # 正向边：上/右偏移
-                new_u = (u_x + nx * offset, u_y + ny * offset)
-                new_v = (v_x + nx * offset, v_y + ny * offset)
-            elif (v, u) in self.bidirectional_edges:
-                # 反向边：下/左偏移
-                new_u = (u_x - nx * offset, u_y - ny * offset)
-                new_v = (v_x - nx * offset, v_y - ny * offset)
-            else:
-                # 单向边：不偏移
-                new_u = (u_x, u_y)
-                new_v = (v_x, v_y)
-            
-            edge_offset[(u, v)] = (new_u, new_v)
-        return edge_offset
+        """找出所有双向边对；统一存 (小, 大) 的规范方向，成员判断 O(1)
+
+        原实现对每条边都在 edges 视图里找反向边，整体 O(E^2)；
+        先物化成 set 后单趟扫描即可
+        """
+        edges_set = set(self.graph.edges())
+        return {(u, v) for u, v in edges_set if (v, u) in edges_set and u < v}
+
+    def _calc_edge_offset(self, offset: float = 0.1):
+        """计算每条边的偏移起点和终点（向量化，一次算完全部边）"""
+        E = list(self.graph.edges())
+        src = np.array([self.node_idx[u] for u, v in E])
+        dst = np.array([self.node_idx[v] for u, v in E])
+        UV = self.pos_arr[src]
+        VW = self.pos_arr[dst]
+
+        # 方向向量、长度和单位法向量整块算，不逐边开方
+        D = VW - UV
+        L = np.hypot(D[:, 0], D[:, 1])
+        L[L == 0] = 1.0
+        N = np.stack([-D[:, 1] / L, D[:, 0] / L], axis=1)
+
+        # 偏移符号：双向边按字典序小->大为正向，+1 / -1；单向边 0（不偏移）
+        sign = np.zeros(len(E))
+        for i, (u, v) in enumerate(E):
+            if (u, v) in self.bidirectional_any:
+                sign[i] = 1.0 if u < v else -1.0
+
+        shift = N * (sign[:, None] * offset)
+        new_U = UV + shift
+        new_V = VW + shift
+
+        # 数组结果挂在实例上，几个 visualize_* 共享同一份几何计算
+        self._edges_list = E
+        self._edge_normals = N
+        self._bidir_sign = sign
+        self._is_bidir = sign != 0  # 与边下标对齐，热循环直接按位查
+        self._offset_U = new_U
+        self._offset_V = new_V
+        self._label_offsets = self._calc_label_offsets()
+        # 中点 + 标签偏移一并算好，画标签时只剩查表
+        self._label_xy = 0.5 * (new_U + new_V) + self._label_offsets
+
+    @property
+    def edge_offset(self) -> Dict[Tuple, Tuple[Tuple, Tuple]]:
+        """{(u, v): (偏移起点, 偏移终点)} 的字典视图，首次访问时才构建"""
+        if self._edge_offset_dict is None:
+            self._edge_offset_dict = {
+                e: (tuple(self._offset_U[i]), tuple(self._offset_V[i]))
+                for i, e in enumerate(self._edges_list)}
+        return self._edge_offset_dict
+
+    def _calc_label_offsets(self) -> np.ndarray:
+        """流量标签相对边中点的偏移，(E, 2) 数组
+
+        只依赖边的几何和双向性，与流量/时间数据无关，初始化时
+        用 np.where 按掩码整批算好，画图时查表即可
+        """
+        A = self._offset_U - self._offset_V
+        a1, a2 = A[:, 0], A[:, 1]
+        sign = self._bidir_sign
+
+        # 斜向边：双向的沿法向让开 1 个单位（方向随正反向翻转），单向不动
+        # （水平/垂直边在这里产生的 inf/nan 随后会被掩码整批覆盖）
+        with np.errstate(divide='ignore', invalid='ignore'):
+            k2 = (a2 / a1) ** 2
+            dx = sign * np.sqrt(k2 / (k2 + 1.0))
+            dy = -sign * np.sqrt(1.0 / (k2 + 1.0))
+
+        # 水平/垂直边按原约定让开 1 个单位，与双向性无关
+        horiz = a2 == 0
+        vert = a1 == 0
+        dx = np.where(horiz, 0.0, dx)
+        dy = np.where(horiz, np.where(a1 > 0, 1.0, -1.0), dy)
+        dx = np.where(vert, np.where(a2 > 0, -1.0, 1.0), dx)
+        dy = np.where(vert, 0.0, dy)
+
+        return np.stack([dx, dy], axis=1)
+
+    def _visible_label_mask(self, xy: np.ndarray, priority: np.ndarray,
+                            cell_w: float = 3.0, cell_h: float = 1.6) -> np.ndarray:
+        """标签抽稀：按优先级从高到低放置，和已放标签挤在一起的丢弃
+
+        用均匀网格近似包围盒相交：格子尺寸取典型标签大小，
+        落进已占用格子的标签直接跳过，整体 O(E) 而非两两比较的 O(E^2)。
+        密集路网上被挡掉的本来就是叠在一起读不出来的标签
+        """
+        keep = np.zeros(len(xy), dtype=bool)
+        occupied = set()
+        for i in np.argsort(-priority):
+            cell = (int(xy[i, 0] // cell_w), int(xy[i, 1] // cell_h))
+            if cell in occupied:
+                continue
+            occupied.add(cell)
+            keep[i] = True
+        return keep
+
+    def _edge_values_to_array(self, nested: Dict[str, Dict[str, float]]) -> np.ndarray:
+        """把 {u: {v: 值}} 的嵌套 dict 按缓存的边顺序铺平成 ndarray；缺的边取 0"""
+        return np.fromiter(
+            (nested.get(u, {}).get(v, 0.0) for u, v in self._edges_list),
+            dtype=np.float64, count=len(self._edges_list))
+
+    def _draw_nodes_and_labels(self, ax):
+        """用 matplotlib 原语画节点和节点名
+
+        坐标都在 pos_arr 里现成可用，一次 scatter 画完全部节点，
+        不再走 networkx 包装层的逐节点预处理
+        """
+        ax.scatter(self.pos_arr[:, 0], self.pos_arr[:, 1], s=800, c='lightblue',
+                   edgecolors='black', alpha=0.9, zorder=2)
+        for name, i in self.node_idx.items():
+            ax.text(self.pos_arr[i, 0], self.pos_arr[i, 1], name,
+                    fontsize=12, fontweight='bold', ha='center', va='center', zorder=3)
 
     def _draw_edges(self, ax, edge_colors='gray', edge_widths=2, alpha=0.8):
         """绘制带偏移/曲率的边（核心方法）"""
-        # 统一处理颜色/宽度为列表
-        if not isinstance(edge_colors, list):
-            edge_colors = [edge_colors] * len(self.graph.edges())
-        if not isinstance(edge_widths, list):
-            edge_widths = [edge_widths] * len(self.graph.edges())
-        
-        # 逐个绘制边
-        for idx, (u, v) in enumerate(self.graph.edges()):
-            (u_x, u_y), (v_x, v_y) = self.edge_offset[(u, v)]
-            
-            # 双向边添加曲率，单向边直线
-            curvature = 0.2 if (u, v) in self.bidirectional_edges or (v, u) in self.bidirectional_edges else 0.0
-            
-            # 绘制弯曲箭头
-            arrow = patches.FancyArrowPatch(
-                (u_x, u_y), (v_x, v_y),
-                connectionstyle=f"arc3,rad={curvature}",
-                arrowstyle='->',
-                mutation_scale=18,  # 箭头大小
-                color=edge_colors[idx],
-                linewidth=edge_widths[idx],
-                alpha=alpha,
-                zorder=1  # 边在节点下方
+        E = self._edges_list
+        # 颜色/宽度统一成 ndarray，子集可以直接花式索引；
+        # 标量只转换一次，再零拷贝广播成 (E, ...) 视图，不生成 N 长 Python 列表
+        if isinstance(edge_colors, (list, np.ndarray)):
+            edge_colors = mcolors.to_rgba_array(edge_colors)
+        else:
+            edge_colors = np.broadcast_to(np.array(mcolors.to_rgba(edge_colors)), (len(E), 4))
+        edge_widths = np.broadcast_to(np.asarray(edge_widths, dtype=np.float64), (len(E),))
+
+        # 单向边是直线，攒成一个 LineCollection 一次画完，箭头交给 quiver；
+        # 双向边带曲率，仍逐个用 FancyArrowPatch——它的箭头路径在绘制时
+        # 才按显示坐标生成，塞进 PatchCollection 会画错形状
+        arrow_patches = []
+        straight = []
+        for idx, (u, v) in enumerate(E):
+            if self._is_bidir[idx]:
+                arrow = patches.FancyArrowPatch(
+                    tuple(self._offset_U[idx]), tuple(self._offset_V[idx]),
+                    connectionstyle="arc3,rad=0.2",
+                    arrowstyle='->',
+                    mutation_scale=18,  # 箭头大小
+                    color=edge_colors[idx],
+                    linewidth=edge_widths[idx],
+                    alpha=alpha,
+                    zorder=1  # 边在节点下方
+                )
+                ax.add_patch(arrow)
+                arrow_patches.append((idx, arrow))
+            else:
+                straight.append(idx)
+
+        lc = quiv = None
+        if straight:
+            U = self._offset_U[straight]
+            V = self._offset_V[straight]
+            segments = np.stack([U, V], axis=1)
+            lc = LineCollection(
+                segments,
+                colors=edge_colors[straight],
+                linewidths=edge_widths[straight],
+                alpha=alpha, zorder=1,
             )
-            ax.add_patch(arrow)
+            # 导出矢量格式（PDF/SVG）时边层整体栅格化一次，文字仍保持矢量
+            lc.set_rasterized(True)
+            ax.add_collection(lc)
+            # 箭头画在终点处，方向沿边
+            D = V - U
+            quiv = ax.quiver(V[:, 0], V[:, 1], D[:, 0], D[:, 1],
+                             color=edge_colors[straight],
+                             angles='xy', scale_units='xy', scale=8, pivot='tip',
+                             width=0.004, alpha=alpha, zorder=1)
 
-    def visualize_network_topology(self, save_path=None, title="交通网络拓扑结构"):
+        # 把 artist 交给调用方缓存，增量更新时直接改属性
+        return {'lc': lc, 'quiver': quiv, 'arrow_patches': arrow_patches, 'straight': straight}
+
+    def visualize_network_topology(self, save_path=None, title="交通网络拓扑结构", dpi=150):
         """可视化拓扑（带标签，无KeyError）"""
-        fig, ax = plt.subplots(figsize=(10, 8))
-        
-        # 1. 绘制节点
-        nx.draw_networkx_nodes(
-            self.graph, self.pos, ax=ax,
-            node_size=800, node_color='lightblue',
-            edgecolors='black', alpha=0.9
-        )
-        
+        ax = self._reset_axes()
+
+        # 1. 绘制节点和节点标签
+        self._draw_nodes_and_labels(ax)
+
         # 2. 绘制边
         self._draw_edges(ax, edge_colors='gray', edge_widths=2, alpha=0.7)
-        
-        # 3. 绘制节点标签
-        nx.draw_networkx_labels(self.graph, self.pos, ax=ax, font_size=12, font_weight='bold')
-        
-        # 4. 手动绘制边标签（核心修复：不用nx的edge_labels）
-        for (u, v) in self.graph.edges():
-            # 获取偏移后的边中点
-            (u_x, u_y), (v_x, v_y) = self.edge_offset[(u, v)]
-            mid_x = (u_x + v_x) / 2
-            mid_y = (u_y + v_y) / 2
-            
-            # 双向边标签额外偏移（避免重叠）
-            if (u, v) in self.bidirectional_edges:
-                mid_y += 3.6
-            elif (v, u) in self.bidirectional_edges:
-                mid_y -= 3.6
+
+        # 3. 手动绘制边标签（核心修复：不用nx的edge_labels）
+        for i, (u, v) in enumerate(self._edges_list):
+            # 偏移后的边中点按边下标直接取数组，不走 (u, v) 元组哈希
+            mid_x = (self._offset_U[i, 0] + self._offset_V[i, 0]) / 2
+            mid_y = (self._offset_U[i, 1] + self._offset_V[i, 1]) / 2
+
+            # 双向边标签额外偏移（避免重叠）；符号数组里单向边是 0
+            mid_y += self._bidir_sign[i] * 3.6
             
             # 绘制标签（带白色背景，提升可读性）
             ax.text(
@@ -151,102 +284,94 @@ class NetworkVisualizer:
         # 图表样式
         ax.set_title(title, fontsize=16, pad=20)
         ax.axis('off')
-        plt.tight_layout()
-        
-        # 保存/显示
+        self.fig.tight_layout()
+
+        # 保存
         if save_path:
-            plt.savefig(save_path, dpi=300, bbox_inches='tight')
-        plt.show()
+            self.fig.savefig(save_path, dpi=dpi, bbox_inches='tight')
+        return self.fig
 
     def visualize_edge_flows(self, edge_flows: Dict[str, Dict[str, str]],
-                             link_travel_time: Dict[str, Dict[str, str]], 
-                             save_path=None, title="边流量分布"):
-        """可视化边流量（带标签）"""
-        fig, ax = plt.subplots(figsize=(12, 9))
-        
-        # 1. 数据预处理
-        flows = []
-        for u, v in self.graph.edges():
-            if u not in edge_flows or v not in edge_flows[u]:
-                flows.append(0)
-            else:
-                flows.append(edge_flows[u][v])
-        max_flow = max(flows) if flows and max(flows) > 0 else 1
-        
-        # 2. 计算边颜色/宽度（按流量缩放）
-        edge_colors = [plt.cm.Reds(flow/max_flow) for flow in flows]
-        edge_widths = [2 + 8 * (flow/max_flow) for flow in flows]
-        
-        # 3. 绘制节点
-        nx.draw_networkx_nodes(
-            self.graph, self.pos, ax=ax,
-            node_size=800, node_color='lightblue',
-            edgecolors='black', alpha=0.9
-        )
-        
-        # 4. 绘制带流量样式的边
-        self._draw_edges(ax, edge_colors=edge_colors, edge_widths=edge_widths, alpha=0.8)
-        
-        # 5. 绘制节点标签
-        nx.draw_networkx_labels(self.graph, self.pos, ax=ax, font_size=12, font_weight='bold')
-        
-        # 6. 手动绘制流量标签
-        for (u, v) in self.graph.edges(): 
-            link_time = link_travel_time[u][v]
-            if u not in edge_flows or v not in edge_flows[u]:  # 忽略无流量的边
-                continue
-            flow = edge_flows[u][v]
-                
-            # 边中点位置
-            (u_x, u_y), (v_x, v_y) = self.edge_offset[(u, v)]
-            mid_x = (u_x + v_x) / 2
-            mid_y = (u_y + v_y) / 2
-
-            a1 = u_x - v_x
-            a2 = u_y - v_y
-            
-            # 双向边标签偏移
-            if a2 == 0:
-                if a1 > 0:  # 顺向边
-                    mid_y += 1.00
-                else:  # 逆向边
-                    mid_y -= 1.00
-            elif a1 == 0:
-                if a2 > 0:  # 顺向边
-                    mid_x -= 1.00
-                else:  # 逆向边
-                    mid_x += 1.00
-            else:
-                k = a2 / a1
-                if (u, v) in self.bidirectional_edges:
-                    mid_y -= np.sqrt(1.00 / (k ** 2 + 1))
-                    mid_x += np.sqrt(1.00 * (k ** 2) / (k ** 2 + 1))
-                elif (v, u) in self.bidirectional_edges:
-                    mid_y += np.sqrt(1.00 / (k ** 2 + 1))
-                    mid_x -= np.sqrt(1.00 * (k ** 2) / (k ** 2 + 1))
-                
-            
-            # 绘制流量标签
-            ax.text(
-                mid_x, mid_y, f"{u} -> {v}\nflow={flow:.0f}\ntime={link_time:.2f}",
+                             link_travel_time: Dict[str, Dict[str, str]],
+                             save_path=None, title="边流量分布", cull_labels=False, dpi=150):
+        """可视化边流量（带标签）
+
+        cull_labels=True 时按流量优先级抽稀重叠的标签（大路网用），
+        默认不抽稀，小路网输出与以前一致。
+        首次调用构建全部 artist；同一实例再次调用时走增量更新，
+        只改颜色/线宽/文字，不重建 collection
+        """
+        # 1. 数据预处理：流量和行程时间各一次铺平成 ndarray，
+        #    后面配色/线宽/标签循环全走整数下标
+        flows = self._edge_values_to_array(edge_flows)
+        times = self._edge_values_to_array(link_travel_time)
+        # 单趟求最大值；initial 兜住空数组，下限 1 避免除零
+        max_flow = max(flows.max(initial=0.0), 1.0)
+
+        # 2. 计算边颜色/宽度（按流量缩放，整个数组一次算完）
+        edge_colors = plt.cm.Reds(flows / max_flow)
+        edge_widths = 2 + 8 * (flows / max_flow)
+        label_visible = self._visible_label_mask(self._label_xy, flows) if cull_labels else None
+
+        # 3. 首次画图建 artist，之后只更新属性
+        if self._flow_artists is None:
+            self._build_flow_plot(edge_colors, edge_widths, flows, times, label_visible)
+        else:
+            self._update_flow_plot(edge_colors, edge_widths, flows, times, label_visible)
+
+        # 4. 颜色条量程、标题每次调用都刷新
+        self._red_sm.set_clim(vmin=0, vmax=max_flow)
+        self.ax.set_title(title, fontsize=16, pad=20)
+        self.fig.tight_layout()
+
+        if save_path:
+            self.fig.savefig(save_path, dpi=dpi, bbox_inches='tight')
+        return self.fig
+
+    @staticmethod
+    def _flow_label(u, v, flow, link_time) -> str:
+        return f"{u} -> {v}\nflow={flow:.0f}\ntime={link_time:.2f}"
+
+    def _build_flow_plot(self, edge_colors, edge_widths, flows, times, label_visible):
+        """首次绘制流量图：构建节点/边/标签/颜色条的全部 artist 并缓存"""
+        ax = self._reset_axes()
+        self._draw_nodes_and_labels(ax)
+        artists = self._draw_edges(ax, edge_colors=edge_colors, edge_widths=edge_widths, alpha=0.8)
+
+        # 每条边都建一个文字 artist，无流量的先隐藏；
+        # 增量更新时只改内容和可见性，不重建
+        texts = []
+        for i, (u, v) in enumerate(self._edges_list):
+            t = ax.text(
+                self._label_xy[i, 0], self._label_xy[i, 1],
+                self._flow_label(u, v, flows[i], times[i]),
                 fontsize=9, ha='center', va='center',
                 bbox=dict(boxstyle='round,pad=0.2', facecolor='white', alpha=0.9),
                 zorder=5
             )
-        
-        # 7. 添加颜色条
-        sm = plt.cm.ScalarMappable(cmap=plt.cm.Reds, norm=plt.Normalize(vmin=0, vmax=max_flow))
-        sm.set_array([])
-        cbar = plt.colorbar(sm, ax=ax, label='流量 (辆/小时)', shrink=0.8)
-        
-        # 图表样式
-        ax.set_title(title, fontsize=16, pad=20)
+            t.set_visible(flows[i] != 0 and (label_visible is None or bool(label_visible[i])))
+            texts.append(t)
+        artists['texts'] = texts
+
+        self.fig.colorbar(self._red_sm, ax=ax, label='流量 (辆/小时)', shrink=0.8)
         ax.axis('off')
-        plt.tight_layout()
-        
-        if save_path:
-            plt.savefig(save_path, dpi=300, bbox_inches='tight')
-        plt.show()
+        self._flow_artists = artists
+
+    def _update_flow_plot(self, edge_colors, edge_widths, flows, times, label_visible):
+        """增量重绘：只改既有 collection/patch/text 的颜色、线宽和文字"""
+        arts = self._flow_artists
+        straight = arts['straight']
+        if arts['lc'] is not None:
+            arts['lc'].set_colors(edge_colors[straight])
+            arts['lc'].set_linewidths(edge_widths[straight])
+            arts['quiver'].set_color(edge_colors[straight])
+        for i, patch in arts['arrow_patches']:
+            patch.set_color(edge_colors[i])
+            patch.set_linewidth(edge_widths[i])
+        for i, (u, v) in enumerate(self._edges_list):
+            t = arts['texts'][i]
+            t.set_text(self._flow_label(u, v, flows[i], times[i]))
+            t.set_visible(flows[i] != 0 and (label_visible is None or bool(label_visible[i])))
 
 
 # 便捷创建函数